@@ -1,12 +1,21 @@
+import asyncio
+import atexit
 import json
 import time
-from datetime import datetime
 import logging
-import re
-from typing import Dict, Optional
+import queue
+from logging.handlers import QueueHandler, QueueListener
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional
+from concurrent.futures import ThreadPoolExecutor
 import os
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 try:
     # Lighter SDK (installed via GitHub clone)
@@ -20,6 +29,19 @@ except Exception:
     TransactionApi = None
     DataApi = None
 
+try:
+    # Optional faster JSON decoder for REST payloads (pip install orjson)
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    # Optional WebSocket price feed (aiohttp is installed with discord.py)
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
 # Load environment variables
 load_dotenv()
 
@@ -33,23 +55,149 @@ logging.basicConfig(
     ]
 )
 
+# Hand log file/console writes to a background thread so trading paths never block on I/O
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, *logging.root.handlers, respect_handler_level=True)
+logging.root.handlers = [QueueHandler(_log_queue)]
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# Separators accepted between TP_FRACTIONS values: comma, slash, or whitespace.
+# Commas and slashes are mapped to spaces so str.split() handles all of them.
+_TP_SEPARATORS = str.maketrans({',': ' ', '/': ' '})
+
+@lru_cache(maxsize=32)
+def _split_tp_fractions(raw: Optional[str], tp_count: int) -> tuple:
+    """Parse a TP_FRACTIONS value into tp_count normalized fractions (memoized)"""
+    try:
+        if raw:
+            parts = raw.translate(_TP_SEPARATORS).split()
+            nums = []
+            for p in parts:
+                p = p.replace('%', '')
+                val = float(p)
+                if val > 1.0:
+                    val = val / 100.0
+                nums.append(val)
+            # If counts mismatch, fallback to equal splits
+            if len(nums) != tp_count:
+                if tp_count > 0:
+                    return (1.0 / float(tp_count),) * tp_count
+                return ()
+            total = sum(nums)
+            if total <= 0:
+                return (1.0 / float(tp_count),) * tp_count if tp_count > 0 else ()
+            # Normalize to sum to 1.0
+            return tuple(n / total for n in nums)
+        # Default: equal fractions; for 3 TPs this is ~33% each
+        return (1.0 / float(tp_count),) * tp_count if tp_count > 0 else ()
+    except Exception:
+        return (1.0 / float(tp_count),) * tp_count if tp_count > 0 else ()
+
+@dataclass(slots=True, frozen=True)
+class TradingConfig:
+    """Trading settings parsed once from the environment at startup"""
+    max_position_size: float
+    leverage: float
+    min_profit_threshold: float
+    stop_loss_percentage: float
+    tp_fractions_raw: Optional[str] = None
+
+@dataclass(slots=True, frozen=True)
+class TradeSignal:
+    """A trade signal with every numeric field coerced once at intake"""
+    action: str
+    symbol: str
+    price: float
+    order_type: str = 'LIMIT'
+    leverage: Optional[float] = None
+    entries: Optional[tuple] = None
+    take_profits: Optional[tuple] = None
+    stop_loss: Optional[float] = None
+    sell_fraction: float = 1.0
+
+    @classmethod
+    def from_raw(cls, signal_data: Dict) -> 'TradeSignal':
+        """Build a signal from the dict produced by the Discord parsers"""
+        entries = signal_data.get('entries')
+        take_profits = signal_data.get('take_profits')
+        leverage = signal_data.get('leverage')
+        stop_loss = signal_data.get('stop_loss')
+        return cls(
+            action=signal_data['action'],
+            symbol=signal_data['symbol'],
+            price=float(signal_data['price']),
+            order_type=signal_data.get('order_type', 'LIMIT').upper(),
+            leverage=float(leverage) if leverage is not None else None,
+            entries=tuple(float(p) for p in entries) if entries else None,
+            take_profits=tuple(float(p) for p in take_profits) if take_profits else None,
+            stop_loss=float(stop_loss) if stop_loss is not None else None,
+            sell_fraction=max(0.0, min(1.0, float(signal_data.get('sell_fraction', 1.0))))
+        )
+
+@dataclass(slots=True)
+class ActiveTrade:
+    """An open position tracked for stop loss / take profit monitoring"""
+    entry_price: float
+    position_size: float
+    initial_position_size: float
+    leverage: float
+    order_type: str = 'LIMIT'
+    entries: Optional[list] = None
+    take_profits: Optional[list] = None
+    tp_filled: Optional[list] = None
+    tp_target_sizes: Optional[list] = None
+    next_tp_index: int = 0
+    stop_loss: Optional[float] = None
+    timestamp_ns: int = field(default_factory=time.time_ns)
+    order_ref: Any = None
+    order_refs: Optional[list] = None
+
 class LighterTrader:
     def __init__(self):
-        # Load configuration and detect API mode
-        load_dotenv()
+        # Configuration comes from the environment (.env is loaded once at import)
         self.api_base = os.getenv('LIGHTER_API_BASE', 'https://api.lighter.xyz')
         self.api_key_private_key = os.getenv('API_KEY_PRIVATE_KEY')
         self.eth_private_key = os.getenv('ETH_PRIVATE_KEY')
         self.account_index = os.getenv('LIGHTER_ACCOUNT_INDEX')
         self.api_key_index = int(os.getenv('API_KEY_INDEX', '2'))  # Default to 2 (first user API key)
+        self.ws_url = os.getenv('LIGHTER_WS_URL')
 
         # Trading configuration
-        self.config = {
-            'max_position_size': float(os.getenv('MAX_POSITION_SIZE', '0.1')),
-            'leverage': float(os.getenv('LEVERAGE', '2.0')),
-            'min_profit_threshold': float(os.getenv('MIN_PROFIT_THRESHOLD', '0.02')),
-            'stop_loss_percentage': float(os.getenv('STOP_LOSS_PERCENTAGE', '0.05')),
-        }
+        self.config = TradingConfig(
+            max_position_size=float(os.getenv('MAX_POSITION_SIZE', '0.1')),
+            leverage=float(os.getenv('LEVERAGE', '2.0')),
+            min_profit_threshold=float(os.getenv('MIN_PROFIT_THRESHOLD', '0.02')),
+            stop_loss_percentage=float(os.getenv('STOP_LOSS_PERCENTAGE', '0.05')),
+            # TP split is read once; parsed fractions are memoized per TP count
+            tp_fractions_raw=os.getenv('TP_FRACTIONS')
+        )
+
+        # Shared HTTP session so REST calls reuse pooled keep-alive connections
+        self.http = requests.Session()
+        # Retry idempotent reads briefly on connection errors and 502/503/504
+        retries = Retry(total=2, backoff_factor=0.1, status_forcelist=(502, 503, 504), allowed_methods=frozenset({'GET'}))
+        self.http.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=retries))
+        self.http.headers.update({
+            'User-Agent': 'copy-trader/1.0',
+            'Accept': 'application/json'
+        })
+
+        # Short-lived market snapshot cache: symbol -> (fetched_at, market_data)
+        self._market_cache: Dict[str, tuple] = {}
+        self._market_cache_ttl = float(os.getenv('MARKET_CACHE_TTL', '2.0'))
+        # Symbols confirmed to exist; markets don't disappear, so never evicted
+        self._known_markets: set = set()
+        # Account balance cache: (fetched_at, balance); cleared whenever an order is placed
+        self._balance_cache: Optional[tuple] = None
+        self._balance_cache_ttl = float(os.getenv('BALANCE_CACHE_TTL', '2.0'))
+        # Latest streamed prices (symbol -> (received_at, price)); only populated while the WS feed is connected
+        self.last_price: Dict[str, tuple] = {}
+        # Streamed prices older than this are ignored, so a symbol the feed stopped ticking falls back to REST
+        self._price_max_age = float(os.getenv('PRICE_MAX_AGE', '5.0'))
+        self._price_event: Optional[asyncio.Event] = None
+        # Worker pool for fanning out independent per-symbol requests
+        self._executor = ThreadPoolExecutor(max_workers=8)
 
         # Initialize Lighter SDK if credentials provided; otherwise run in simulation mode
         self.simulation_mode = (
@@ -61,6 +209,9 @@ class LighterTrader:
         self.signer_client = None
         self.transaction_api = None
         self.data_api = None
+        # Bound order-submission methods, resolved once after SDK init
+        self._create_order = None
+        self._send_tx = None
         
         if not self.simulation_mode:
             try:
@@ -83,13 +234,19 @@ class LighterTrader:
                     )
                     self.transaction_api = TransactionApi(self.api_base)
                     self.data_api = DataApi(self.api_base)
+                    self._create_order = self.signer_client.create_order
+                    self._send_tx = self.transaction_api.send_tx
                     logging.info("Lighter SDK initialized - live trading enabled")
             except Exception as e:
                 logging.warning(f"Failed to initialize Lighter SDK, falling back to simulation mode: {str(e)}")
                 self.simulation_mode = True
 
-        # Initialize trade tracking
-        self.active_trades: Dict[str, Dict] = {}
+        # Initialize trade tracking (insertion-ordered so the oldest trade can be evicted)
+        self.active_trades: Dict[str, ActiveTrade] = OrderedDict()
+        self.max_active_trades = max(1, int(os.getenv('MAX_ACTIVE_TRADES', '64')))
+        # Signals and position checks run on worker threads; one at a time so sizing,
+        # balance reads and active_trades updates never interleave
+        self._trade_lock = threading.Lock()
 
     def _get_account_index(self) -> Optional[str]:
         """Retrieve account index from Lighter API using ETH address"""
@@ -107,47 +264,74 @@ class LighterTrader:
 
     def _parse_tp_fractions(self, tp_count: int) -> list:
         """Return a list of TP fractions (of original position) to close per TP.
-        - Reads TP_FRACTIONS from env if provided (comma or slash separated).
+        - Uses TP_FRACTIONS from env (read at startup) if provided (comma or slash separated).
         - Accepts decimals (0.25) or percentages (25, 25%).
         - Falls back to equal fractions across TP count.
         """
-        try:
-            raw = os.getenv('TP_FRACTIONS')
-            if raw:
-                # Split on comma, slash, or whitespace
-                parts = re.split(r'[\s,\/]+', raw.strip())
-                nums = []
-                for p in parts:
-                    if not p:
-                        continue
-                    p = p.replace('%', '')
-                    val = float(p)
-                    if val > 1.0:
-                        val = val / 100.0
-                    nums.append(val)
-                # If counts mismatch, fallback to equal splits
-                if len(nums) != tp_count:
-                    if tp_count > 0:
-                        return [1.0 / float(tp_count)] * tp_count
-                    return []
-                total = sum(nums)
-                if total <= 0:
-                    return [1.0 / float(tp_count)] * tp_count if tp_count > 0 else []
-                # Normalize to sum to 1.0
-                return [n / total for n in nums]
-            # Default: equal fractions; for 3 TPs this is ~33% each
-            return [1.0 / float(tp_count)] * tp_count if tp_count > 0 else []
-        except Exception:
-            return [1.0 / float(tp_count)] * tp_count if tp_count > 0 else []
+        return list(_split_tp_fractions(self.config.tp_fractions_raw, tp_count))
         
+    def _tp_target_sizes(self, take_profits: Optional[tuple], position_size: float) -> Optional[list]:
+        """Close size for each TP level, fixed at entry from the original position size"""
+        if not take_profits:
+            return None
+        return [position_size * f for f in self._parse_tp_fractions(len(take_profits))]
+
+    def _sorted_tps(self, take_profits: Optional[tuple], position_size: float) -> tuple:
+        """TP levels in ascending order with their close sizes, so fills can walk them in order.
+        Each level keeps the size of its position in the signal (TP_FRACTIONS order).
+        """
+        if not take_profits:
+            return None, None
+        pairs = sorted(zip(take_profits, self._tp_target_sizes(take_profits, position_size)))
+        return [tp for tp, _ in pairs], [size for _, size in pairs]
+
+    def _live_trade_count(self) -> int:
+        """Number of tracked trades that hold an open position"""
+        return sum(1 for trade in self.active_trades.values() if trade.position_size > 0)
+
+    def _track_trade(self, symbol: str, trade: ActiveTrade):
+        """Record a trade, evicting the oldest untracked ones beyond MAX_ACTIVE_TRADES.
+        Open positions are never evicted (execute_buy refuses new ones at the limit).
+        """
+        self.active_trades[symbol] = trade
+        self.active_trades.move_to_end(symbol)
+        excess = len(self.active_trades) - self.max_active_trades
+        if excess > 0:
+            evictable = [s for s, t in self.active_trades.items() if t.position_size <= 0][:excess]
+            for evicted in evictable:
+                del self.active_trades[evicted]
+                logging.warning("Tracking limit of %s trades reached; dropped untracked signal for %s", self.max_active_trades, evicted)
+
+    def snapshot_trades(self) -> list:
+        """(symbol, trade) pairs copied under the trade lock, safe to iterate from any thread"""
+        with self._trade_lock:
+            return list(self.active_trades.items())
+
     def _validate_environment(self):
         """Retained for backward compatibility; no-op in API mode."""
         return True
 
+    def close(self):
+        """Release pooled HTTP connections and worker threads.
+        Waits for an in-flight signal or position check, which may still need the pool.
+        """
+        with self._trade_lock:
+            self._executor.shutdown(wait=False)
+            self.http.close()
+
     def get_market_info(self, symbol: str) -> Dict:
         """Get market information from Lighter API.
         Falls back to REST call if SDK is unavailable.
         """
+        # Serve repeated lookups within the TTL window from memory
+        cached = self._market_cache.get(symbol)
+        if cached is not None and time.monotonic() - cached[0] < self._market_cache_ttl:
+            return cached[1]
+
+        return self._fetch_market_info(symbol)
+
+    def _fetch_market_info(self, symbol: str) -> Optional[Dict]:
+        """Fetch market info over the network and refresh the TTL cache"""
         try:
             if self.data_api is not None:
                 # Use SDK to fetch market data
@@ -159,15 +343,30 @@ class LighterTrader:
                     logging.warning(f"Could not get market info via SDK: {str(e)}")
             
             # Fallback: REST API call
-            response = requests.get(f"{self.api_base}/markets/{symbol}", timeout=5)
+            response = self.http.get(f"{self.api_base}/markets/{symbol}", timeout=5)
             if response.status_code == 200:
-                market_data = response.json()
+                market_data = _json_loads(response.content)
+                self._market_cache[symbol] = (time.monotonic(), market_data)
+                self._known_markets.add(symbol)
                 return market_data
+            # Drop stale data so the next call forces a refresh
+            self._market_cache.pop(symbol, None)
             return None
         except Exception as e:
-            logging.error(f"Error fetching market info: {str(e)}")
+            logging.error("Error fetching market info: %s", e)
+            self._market_cache.pop(symbol, None)
             return None
 
+    def get_markets_info(self, symbols: Iterable[str]) -> Dict[str, Dict]:
+        """Fetch market info for several symbols at once.
+        Lighter's REST fallback is per-symbol, so requests are issued
+        concurrently and the wall-clock cost is one round-trip, not N.
+        """
+        symbols = list(symbols)
+        if len(symbols) <= 1:
+            return {symbol: self.get_market_info(symbol) for symbol in symbols}
+        return dict(zip(symbols, self._executor.map(self.get_market_info, symbols)))
+
     def get_account_balance(self) -> float:
         """Get account balance from Lighter"""
         try:
@@ -175,68 +374,88 @@ class LighterTrader:
                 # In simulation mode, return a default balance for testing
                 return 100.0  # Default $100 for simulation
             
+            cached = self._balance_cache
+            if cached is not None and time.monotonic() - cached[0] < self._balance_cache_ttl:
+                return cached[1]
+            
             # Get account info from Lighter
             try:
                 # This is a placeholder - adjust based on actual Lighter SDK methods
                 # You may need to call methods like get_account_value, get_balances, etc.
-                response = requests.get(
+                response = self.http.get(
                     f"{self.api_base}/accounts/{self.account_index}/balance",
                     timeout=5
                 )
                 if response.status_code == 200:
-                    balance_data = response.json()
+                    balance_data = _json_loads(response.content)
                     # Extract balance from response (structure depends on Lighter API)
                     if 'accountValue' in balance_data:
-                        return float(balance_data['accountValue'])
+                        balance = float(balance_data['accountValue'])
                     elif 'balance' in balance_data:
-                        return float(balance_data['balance'])
+                        balance = float(balance_data['balance'])
+                    else:
+                        return 0.0
+                    self._balance_cache = (time.monotonic(), balance)
+                    return balance
             except Exception as e:
-                logging.warning(f"Could not get balance: {str(e)}")
+                logging.warning("Could not get balance: %s", e)
             
             return 0.0
         except Exception as e:
             logging.error(f"Error getting account balance: {str(e)}")
             return 0.0
 
-    def get_position_size(self, symbol: str, price: float) -> float:
+    def get_position_size(self, symbol: str, price: float, account_balance: Optional[float] = None,
+                          leverage: Optional[float] = None) -> float:
         """Calculate position size in coin units based on percentage of account balance.
         MAX_POSITION_SIZE now represents the percentage of account balance to use (0.0-1.0).
+        Pass account_balance to reuse a balance already fetched by the caller, and
+        leverage to size with the signal's leverage rather than the configured one.
         """
         try:
             # Get account balance in USD
-            account_balance = self.get_account_balance()
+            if account_balance is None:
+                account_balance = self.get_account_balance()
             if account_balance <= 0:
                 logging.error("Account balance is zero or negative")
                 return 0.0
             
             # MAX_POSITION_SIZE is now a percentage (0.0-1.0)
-            position_percentage = float(self.config['max_position_size'])
+            position_percentage = self.config.max_position_size
             
             # Validate percentage
             if position_percentage <= 0 or position_percentage > 1.0:
-                logging.error(f"Invalid position percentage: {position_percentage}. Must be between 0.0 and 1.0")
+                logging.error("Invalid position percentage: %s. Must be between 0.0 and 1.0", position_percentage)
                 return 0.0
             
             # Calculate USD amount to use for this position
             usd_to_use = account_balance * position_percentage
             
             # Apply leverage to get total position value
-            leverage = float(self.config['leverage'])
+            if leverage is None:
+                leverage = self.config.leverage
             total_position_value = usd_to_use * leverage
             
             # Convert to coin units
             coin_units = total_position_value / price
             
-            logging.info(f"Position sizing: ${account_balance:.2f} balance × {position_percentage:.1%} = ${usd_to_use:.2f} × {leverage}x leverage = ${total_position_value:.2f} position = {coin_units:.6f} {symbol}")
+            logging.info(
+                "Position sizing: $%.2f balance × %.1f%% = $%.2f × %sx leverage = $%.2f position = %.6f %s",
+                account_balance, position_percentage * 100, usd_to_use, leverage, total_position_value, coin_units, symbol
+            )
             
             return coin_units
             
         except Exception as e:
-            logging.error(f"Error calculating position size: {str(e)}")
+            logging.error("Error calculating position size: %s", e)
             return 0.0
 
     def receive_trade_signal(self, signal_data: Dict):
         """Process incoming trade signals"""
+        with self._trade_lock:
+            return self._receive_trade_signal(signal_data)
+
+    def _receive_trade_signal(self, signal_data: Dict):
         try:
             # Validate signal data
             required_fields = ['action', 'symbol', 'price']
@@ -244,212 +463,231 @@ class LighterTrader:
                 logging.error("Invalid signal data: missing required fields")
                 return False
             
+            # Coerce every numeric field once; downstream code uses typed attributes
+            signal = TradeSignal.from_raw(signal_data)
+            
             # If in simulation mode (no API credentials), log and simulate
             if self.simulation_mode:
-                logging.info(f"Signal received: {signal_data['action']} {signal_data['symbol']} @ ${signal_data['price']}")
+                logging.info("Signal received: %s %s @ $%s", signal.action, signal.symbol, signal_data['price'])
                 # Simulate tracking for testing mode
-                if signal_data['action'] == 'BUY':
-                    entries = signal_data.get('entries')
-                    take_profits = signal_data.get('take_profits')
-                    self.active_trades[signal_data['symbol']] = {
-                        'entry_price': float(signal_data['price']) if not entries else float(entries[0]),
-                        'entries': [float(p) for p in entries] if entries else None,
-                        'take_profits': [float(p) for p in take_profits] if take_profits else None,
-                        'tp_filled': [False] * len(take_profits) if take_profits else None,
-                        'stop_loss': float(signal_data['stop_loss']) if 'stop_loss' in signal_data else None,
-                        'position_size': 0,
-                        'leverage': float(signal_data.get('leverage', self.config['leverage'])),
-                        'order_type': signal_data.get('order_type', 'LIMIT').upper(),
-                        'timestamp': datetime.now(),
-                        'tx_hash': None
-                    }
+                if signal.action == 'BUY':
+                    entries = signal.entries
+                    take_profits = signal.take_profits
+                    tp_levels, tp_sizes = self._sorted_tps(take_profits, 0)
+                    self._track_trade(signal.symbol, ActiveTrade(
+                        entry_price=signal.price if not entries else entries[0],
+                        position_size=0.0,
+                        initial_position_size=0.0,
+                        leverage=signal.leverage if signal.leverage is not None else self.config.leverage,
+                        order_type=signal.order_type,
+                        entries=list(entries) if entries else None,
+                        take_profits=tp_levels,
+                        tp_filled=[False] * len(tp_levels) if tp_levels else None,
+                        tp_target_sizes=tp_sizes,
+                        stop_loss=signal.stop_loss
+                    ))
                 logging.warning("Simulation mode - signal tracked but not executed")
                 return True  # Return True so Discord bot shows success for testing
             
             # Update leverage if provided
-            if 'leverage' in signal_data:
-                self.config['leverage'] = float(signal_data['leverage'])
+            if signal.leverage is not None:
+                self.config = replace(self.config, leverage=signal.leverage)
             
             # Process the trade signal
-            if signal_data['action'] == 'BUY':
-                return self.execute_buy(signal_data)
-            elif signal_data['action'] == 'SELL':
-                return self.execute_sell(signal_data)
+            if signal.action == 'BUY':
+                return self.execute_buy(signal)
+            elif signal.action == 'SELL':
+                return self.execute_sell(signal)
             else:
-                logging.error(f"Invalid action: {signal_data['action']}")
+                logging.error(f"Invalid action: {signal.action}")
                 return False
                 
         except Exception as e:
             logging.error(f"Error processing trade signal: {str(e)}")
             return False
 
-    def execute_buy(self, signal_data: Dict) -> bool:
+    def execute_buy(self, signal: TradeSignal) -> bool:
         """Execute a buy order using Lighter SDK (or simulate if not available)."""
         try:
-            symbol = signal_data['symbol']
-            order_type = signal_data.get('order_type', 'LIMIT').upper()
+            symbol = signal.symbol
+            order_type = signal.order_type
+            leverage = signal.leverage if signal.leverage is not None else self.config.leverage
             
-            # Get market info
-            market_info = self.get_market_info(symbol)
-            if not market_info:
-                logging.error(f"Market info not found for {symbol}")
+            # Refuse new positions at the limit rather than open one SL/TP would never watch
+            if symbol not in self.active_trades and self._live_trade_count() >= self.max_active_trades:
+                logging.error("Tracking limit of %s open trades reached; not opening %s", self.max_active_trades, symbol)
                 return False
             
-            entries: Optional[list] = signal_data.get('entries')
-            take_profits: Optional[list] = signal_data.get('take_profits')
+            # Read the balance in the background while market info is looked up
+            balance_future = self._executor.submit(self.get_account_balance)
+            
+            # Get market info (limit orders on an already-seen market skip the fetch)
+            market_info = None
+            if order_type == 'MARKET' or symbol not in self._known_markets:
+                market_info = self.get_market_info(symbol)
+                if not market_info:
+                    logging.error("Market info not found for %s", symbol)
+                    return False
+            
+            # One balance read serves every entry of this buy
+            account_balance = balance_future.result()
+            entries = signal.entries
+            take_profits = signal.take_profits
             order_refs = []
             total_position_size = 0.0
             avg_price_accumulator = 0.0
             
             if entries and order_type == 'LIMIT':
                 # Laddered limit entries
-                logging.info(f"Placing laddered entries for {symbol}: {entries}")
-                for entry_str in entries:
-                    execution_price = float(entry_str)
-                    position_size = self.get_position_size(symbol, execution_price) / float(len(entries))
+                logging.info("Placing laddered entries for %s: %s", symbol, entries)
+                for execution_price in entries:
+                    position_size = self.get_position_size(symbol, execution_price, account_balance, leverage) / float(len(entries))
                     if position_size <= 0:
                         logging.error("Invalid position size for ladder entry")
                         continue
                     
                     if self.simulation_mode or self.signer_client is None:
                         order_refs.append({"simulated": True, "px": execution_price, "sz": position_size})
-                        total_position_size += float(position_size)
-                        avg_price_accumulator += execution_price * float(position_size)
-                        logging.info(f"[SIM] Ladder entry at ${execution_price} for {position_size} {symbol}")
+                        total_position_size += position_size
+                        avg_price_accumulator += execution_price * position_size
+                        logging.info("[SIM] Ladder entry at $%s for %s %s", execution_price, position_size, symbol)
                     else:
                         # Create order using Lighter SDK
                         # Note: Adjust parameters based on actual Lighter SDK methods
                         try:
-                            nonce = self.transaction_api.next_nonce(self.account_index)
-                            signed_order = self.signer_client.create_order(
+                            signed_order = self._create_order(
                                 ticker=symbol,
                                 amount=str(position_size),
                                 price=str(execution_price),
                                 side='buy',
                                 order_type='limit'
                             )
-                            resp = self.transaction_api.send_tx(signed_order)
+                            resp = self._send_tx(signed_order)
                             order_refs.append(resp)
-                            total_position_size += float(position_size)
-                            avg_price_accumulator += execution_price * float(position_size)
-                            logging.info(f"Ladder entry placed at ${execution_price}: {resp}")
+                            total_position_size += position_size
+                            avg_price_accumulator += execution_price * position_size
+                            logging.info("Ladder entry placed at $%s: %s", execution_price, resp)
                         except Exception as e:
-                            logging.error(f"Error placing ladder entry: {str(e)}")
+                            logging.error("Error placing ladder entry: %s", e)
                             continue
                 
+                # Placed entries tie up margin, so the next sizing must re-read the balance
+                self._balance_cache = None
                 if total_position_size == 0:
                     return False
                     
                 avg_entry_price = avg_price_accumulator / total_position_size
-                self.active_trades[symbol] = {
-                    'entry_price': avg_entry_price,
-                    'entries': [float(p) for p in entries],
-                    'position_size': float(total_position_size),
-                    'initial_position_size': float(total_position_size),
-                    'leverage': self.config['leverage'],
-                    'order_type': order_type,
-                    'timestamp': datetime.now(),
-                    'order_refs': order_refs,
-                    'take_profits': [float(p) for p in take_profits] if take_profits else None,
-                    'tp_filled': [False] * len(take_profits) if take_profits else None,
-                    'stop_loss': float(signal_data['stop_loss']) if 'stop_loss' in signal_data else None
-                }
+                tp_levels, tp_sizes = self._sorted_tps(take_profits, total_position_size)
+                self._track_trade(symbol, ActiveTrade(
+                    entry_price=avg_entry_price,
+                    position_size=total_position_size,
+                    initial_position_size=total_position_size,
+                    leverage=leverage,
+                    order_type=order_type,
+                    entries=list(entries),
+                    take_profits=tp_levels,
+                    tp_filled=[False] * len(tp_levels) if tp_levels else None,
+                    tp_target_sizes=tp_sizes,
+                    stop_loss=signal.stop_loss,
+                    order_refs=order_refs
+                ))
                 return True
             else:
                 # Single entry (market or limit)
                 if order_type == 'MARKET':
                     current_price = float(market_info.get('price', 0))
                     if current_price == 0:
-                        logging.error(f"Could not get current market price for {symbol}")
+                        logging.error("Could not get current market price for %s", symbol)
                         return False
                     execution_price = current_price
-                    logging.info(f"Market order: Using current price ${current_price} for {symbol}")
+                    logging.info("Market order: Using current price $%s for %s", current_price, symbol)
                 else:
-                    execution_price = float(signal_data['price'])
-                    logging.info(f"Limit order: Using specified price ${execution_price} for {symbol}")
+                    execution_price = signal.price
+                    logging.info("Limit order: Using specified price $%s for %s", execution_price, symbol)
                 
-                position_size = self.get_position_size(symbol, execution_price)
+                position_size = self.get_position_size(symbol, execution_price, account_balance, leverage)
                 if position_size <= 0:
                     logging.error("Invalid position size")
                     return False
                 
                 if self.simulation_mode or self.signer_client is None:
                     order_ref = {"simulated": True, "px": execution_price, "sz": position_size}
-                    logging.info(f"[SIM] Buy {symbol} {position_size} @ ${execution_price}")
+                    logging.info("[SIM] Buy %s %s @ $%s", symbol, position_size, execution_price)
                 else:
                     try:
                         # Create order using Lighter SDK
-                        nonce = self.transaction_api.next_nonce(self.account_index)
-                        signed_order = self.signer_client.create_order(
+                        signed_order = self._create_order(
                             ticker=symbol,
                             amount=str(position_size),
                             price=str(execution_price),
                             side='buy',
                             order_type='market' if order_type == 'MARKET' else 'limit'
                         )
-                        order_ref = self.transaction_api.send_tx(signed_order)
-                        logging.info(f"Order placed: {order_ref}")
+                        order_ref = self._send_tx(signed_order)
+                        self._balance_cache = None
+                        logging.info("Order placed: %s", order_ref)
                     except Exception as e:
-                        logging.error(f"Error placing order: {str(e)}")
+                        logging.error("Error placing order: %s", e)
                         return False
                 
-                self.active_trades[symbol] = {
-                    'entry_price': execution_price,
-                    'entries': None,
-                    'position_size': float(position_size),
-                    'initial_position_size': float(position_size),
-                    'leverage': self.config['leverage'],
-                    'order_type': order_type,
-                    'timestamp': datetime.now(),
-                    'order_ref': order_ref,
-                    'take_profits': [float(p) for p in take_profits] if take_profits else None,
-                    'tp_filled': [False] * len(take_profits) if take_profits else None,
-                    'stop_loss': float(signal_data['stop_loss']) if 'stop_loss' in signal_data else None
-                }
+                tp_levels, tp_sizes = self._sorted_tps(take_profits, position_size)
+                self._track_trade(symbol, ActiveTrade(
+                    entry_price=execution_price,
+                    position_size=position_size,
+                    initial_position_size=position_size,
+                    leverage=leverage,
+                    order_type=order_type,
+                    take_profits=tp_levels,
+                    tp_filled=[False] * len(tp_levels) if tp_levels else None,
+                    tp_target_sizes=tp_sizes,
+                    stop_loss=signal.stop_loss,
+                    order_ref=order_ref
+                ))
                 logging.info("Buy order placed")
                 return True
                 
         except Exception as e:
-            logging.error(f"Error executing buy order: {str(e)}")
+            logging.error("Error executing buy order: %s", e)
             return False
 
-    def execute_sell(self, signal_data: Dict) -> bool:
+    def execute_sell(self, signal: TradeSignal) -> bool:
         """Execute a sell/close order using Lighter SDK (or simulate)."""
         try:
-            symbol = signal_data['symbol']
-            order_type = signal_data.get('order_type', 'LIMIT').upper()
+            symbol = signal.symbol
+            order_type = signal.order_type
             
             # Check if we have an active position
-            if symbol not in self.active_trades:
+            trade = self.active_trades.get(symbol)
+            if trade is None:
                 logging.error("No active position to sell")
                 return False
             
-            # Get market info
-            market_info = self.get_market_info(symbol)
-            if not market_info:
-                logging.error(f"Market info not found for {symbol}")
-                return False
+            # Get market info (limit orders on an already-seen market skip the fetch)
+            market_info = None
+            if order_type == 'MARKET' or symbol not in self._known_markets:
+                market_info = self.get_market_info(symbol)
+                if not market_info:
+                    logging.error("Market info not found for %s", symbol)
+                    return False
             
             # Handle market vs limit orders
             if order_type == 'MARKET':
                 # For market orders, get current market price
                 current_price = float(market_info.get('price', 0))
                 if current_price == 0:
-                    logging.error(f"Could not get current market price for {symbol}")
+                    logging.error("Could not get current market price for %s", symbol)
                     return False
                 
                 execution_price = current_price
-                logging.info(f"Market sell order: Using current price ${current_price} for {symbol}")
+                logging.info("Market sell order: Using current price $%s for %s", current_price, symbol)
             else:
                 # For limit orders, use the specified price
-                execution_price = float(signal_data['price'])
-                logging.info(f"Limit sell order: Using specified price ${execution_price} for {symbol}")
+                execution_price = signal.price
+                logging.info("Limit sell order: Using specified price $%s for %s", execution_price, symbol)
             
-            # Determine size to close (support partial close)
-            sell_fraction = float(signal_data.get('sell_fraction', 1.0))
-            sell_fraction = max(0.0, min(1.0, sell_fraction))
-            current_position_size = float(self.active_trades[symbol]['position_size'])
-            size_to_close = float(current_position_size * sell_fraction)
+            # Determine size to close (support partial close; fraction is clamped at intake)
+            current_position_size = trade.position_size
+            size_to_close = current_position_size * signal.sell_fraction
             if size_to_close <= 0:
                 logging.error("Computed close size is zero; skipping sell")
                 return False
@@ -457,12 +695,11 @@ class LighterTrader:
             # Place reduce-only order
             if self.simulation_mode or self.signer_client is None:
                 order_ref = {"simulated": True, "px": execution_price, "sz": size_to_close}
-                logging.info(f"[SIM] Sell {symbol} {size_to_close} @ ${execution_price}")
+                logging.info("[SIM] Sell %s %s @ $%s", symbol, size_to_close, execution_price)
             else:
                 try:
                     # Create sell order using Lighter SDK
-                    nonce = self.transaction_api.next_nonce(self.account_index)
-                    signed_order = self.signer_client.create_order(
+                    signed_order = self._create_order(
                         ticker=symbol,
                         amount=str(size_to_close),
                         price=str(execution_price),
@@ -470,106 +707,218 @@ class LighterTrader:
                         order_type='market' if order_type == 'MARKET' else 'limit',
                         reduce_only=True
                     )
-                    order_ref = self.transaction_api.send_tx(signed_order)
-                    logging.info(f"Sell order placed: {order_ref}")
+                    order_ref = self._send_tx(signed_order)
+                    self._balance_cache = None
+                    logging.info("Sell order placed: %s", order_ref)
                 except Exception as e:
-                    logging.error(f"Error placing sell order: {str(e)}")
+                    logging.error("Error placing sell order: %s", e)
                     return False
 
             # Calculate profit/loss (approximate for partial)
-            entry_price = self.active_trades[symbol]['entry_price']
+            entry_price = trade.entry_price
             exit_price = execution_price
-            profit_percentage = (exit_price - entry_price) / entry_price * self.config['leverage']
-            logging.info(f"Sell order placed. P/L (per unit): {profit_percentage:.2%}")
+            profit_percentage = (exit_price - entry_price) / entry_price * self.config.leverage
+            logging.info("Sell order placed. P/L (per unit): %.2f%%", profit_percentage * 100)
 
             # Update position size / close trade if fully exited
             remaining = current_position_size - size_to_close
-            if remaining <= 0:
+            if remaining <= 1e-12:
                 del self.active_trades[symbol]
             else:
-                self.active_trades[symbol]['position_size'] = float(remaining)
+                trade.position_size = remaining
             return True
                 
         except Exception as e:
-            logging.error(f"Error executing sell order: {str(e)}")
+            logging.error("Error executing sell order: %s", e)
             return False
 
-    def check_positions(self):
-        """Check active positions for stop loss or take profit conditions"""
-        for symbol, trade in self.active_trades.items():
+    def check_positions(self, prices: Optional[Dict[str, float]] = None):
+        """Check active positions for stop loss or take profit conditions.
+        Pass prices ({symbol: price}, e.g. from a streaming feed) to skip the REST fetch;
+        symbols missing from it are still fetched over REST.
+        """
+        with self._trade_lock:
+            self._check_positions(prices)
+
+    def _check_positions(self, prices: Optional[Dict[str, float]] = None):
+        active_trades = self.active_trades
+        # Trades with nothing left to close (e.g. simulation-tracked signals) can't trigger a sell
+        trades = [(symbol, trade) for symbol, trade in active_trades.items() if trade.position_size > 0]
+        if not trades:
+            return
+        markets = {}
+        if prices is not None:
+            markets = {symbol: {'price': prices[symbol]} for symbol, _ in trades if symbol in prices}
+        # Fetch every market without a pushed price in one concurrent pass
+        missing = [symbol for symbol, _ in trades if symbol not in markets]
+        if missing:
+            markets.update(self.get_markets_info(missing))
+        stop_loss_percentage = self.config.stop_loss_percentage
+        min_profit_threshold = self.config.min_profit_threshold
+        # Iterate a snapshot: execute_sell deletes fully closed trades mid-loop
+        for symbol, trade in trades:
             try:
-                # Get current price from Lighter API
-                market_info = self.get_market_info(symbol)
+                market_info = markets.get(symbol)
                 if not market_info:
                     continue
                     
                 current_price = float(market_info['price'])
+                # Leveraged P&L, computed once and shared by the SL and min-profit checks
+                profit_percentage = (current_price - trade.entry_price) / trade.entry_price * trade.leverage
                 
                 # Stop loss by absolute level if provided, else by percentage
-                if trade.get('stop_loss') is not None:
-                    if current_price <= float(trade['stop_loss']):
-                        logging.info(f"Stop loss level hit for {symbol} at ${current_price}")
-                        self.execute_sell({
-                            'action': 'SELL',
-                            'symbol': symbol,
-                            'price': current_price,
-                            'order_type': 'MARKET'
-                        })
+                if trade.stop_loss is not None:
+                    if current_price <= trade.stop_loss:
+                        logging.info("Stop loss level hit for %s at $%s", symbol, current_price)
+                        self.execute_sell(TradeSignal(
+                            action='SELL',
+                            symbol=symbol,
+                            price=current_price,
+                            order_type='MARKET'
+                        ))
                         continue
                 else:
-                    profit_percentage = (current_price - trade['entry_price']) / trade['entry_price'] * trade['leverage']
-                    if profit_percentage <= -self.config['stop_loss_percentage']:
-                        logging.info(f"Stop loss percentage triggered for {symbol}")
-                        self.execute_sell({
-                            'action': 'SELL',
-                            'symbol': symbol,
-                            'price': current_price,
-                            'order_type': 'MARKET'
-                        })
+                    if profit_percentage <= -stop_loss_percentage:
+                        logging.info("Stop loss percentage triggered for %s", symbol)
+                        self.execute_sell(TradeSignal(
+                            action='SELL',
+                            symbol=symbol,
+                            price=current_price,
+                            order_type='MARKET'
+                        ))
                         continue
                 
                 # Multiple take profits support
-                if trade.get('take_profits') and trade.get('tp_filled'):
-                    tp_levels = trade['take_profits']
-                    fractions = self._parse_tp_fractions(len(tp_levels))
-                    initial_size = int(trade.get('initial_position_size', trade['position_size']))
-                    current_size = int(trade['position_size'])
-                    closed_so_far = max(initial_size - current_size, 0)
-                    for idx, tp in enumerate(tp_levels):
-                        if not trade['tp_filled'][idx] and current_price >= float(tp):
-                            logging.info(f"TP{idx+1} hit for {symbol} at ${current_price} (target ${tp})")
-                            # Compute target close size based on original position
-                            target_for_this_tp = int(initial_size * float(fractions[idx]))
-                            size_to_close = max(0, min(current_size, target_for_this_tp))
-                            if size_to_close <= 0 or current_size <= 0:
-                                trade['tp_filled'][idx] = True
-                                continue
-                            sell_fraction = float(size_to_close) / float(current_size)
-                            self.execute_sell({
-                                'action': 'SELL',
-                                'symbol': symbol,
-                                'price': current_price,
-                                'order_type': 'MARKET',
-                                'sell_fraction': sell_fraction
-                            })
-                            # Mark TP as filled if position still exists
-                            if symbol in self.active_trades:
-                                self.active_trades[symbol]['tp_filled'][idx] = True
+                if trade.take_profits and trade.tp_filled:
+                    tp_levels = trade.take_profits
+                    # Per-TP close sizes are fixed at entry; see _tp_target_sizes
+                    tp_target_sizes = trade.tp_target_sizes
+                    current_size = trade.position_size
+                    # Levels are sorted ascending at entry, so only the next unfilled level can hit
+                    while trade.next_tp_index < len(tp_levels):
+                        idx = trade.next_tp_index
+                        tp = tp_levels[idx]
+                        if current_price < tp:
                             break
+                        logging.info("TP%s hit for %s at $%s (target $%s)", idx+1, symbol, current_price, tp)
+                        target_for_this_tp = tp_target_sizes[idx]
+                        size_to_close = max(0.0, min(current_size, target_for_this_tp))
+                        # Sizes are fractional coin units; ignore float dust
+                        if size_to_close <= 1e-12 or current_size <= 1e-12:
+                            trade.tp_filled[idx] = True
+                            trade.next_tp_index = idx + 1
+                            continue
+                        sell_fraction = size_to_close / current_size
+                        self.execute_sell(TradeSignal(
+                            action='SELL',
+                            symbol=symbol,
+                            price=current_price,
+                            order_type='MARKET',
+                            sell_fraction=sell_fraction
+                        ))
+                        # Mark TP as filled if position still exists
+                        if symbol in active_trades:
+                            trade.tp_filled[idx] = True
+                            trade.next_tp_index = idx + 1
+                        break
                 else:
                     # Legacy min profit threshold
-                    profit_percentage = (current_price - trade['entry_price']) / trade['entry_price'] * trade['leverage']
-                    if profit_percentage >= self.config['min_profit_threshold']:
-                        logging.info(f"Take profit triggered for {symbol}")
-                        self.execute_sell({
-                            'action': 'SELL',
-                            'symbol': symbol,
-                            'price': current_price,
-                            'order_type': 'MARKET'
-                        })
+                    if profit_percentage >= min_profit_threshold:
+                        logging.info("Take profit triggered for %s", symbol)
+                        self.execute_sell(TradeSignal(
+                            action='SELL',
+                            symbol=symbol,
+                            price=current_price,
+                            order_type='MARKET'
+                        ))
                     
             except Exception as e:
-                logging.error(f"Error checking position for {symbol}: {str(e)}")
+                logging.error("Error checking position for %s: %s", symbol, e)
+
+    async def stream_prices(self):
+        """Keep last_price updated from the ticker WebSocket at LIGHTER_WS_URL.
+        This is a placeholder subscription format - adjust based on the actual Lighter stream API.
+        Reconnects with exponential backoff; prices are dropped while disconnected.
+        """
+        backoff = 1.0
+        while True:
+            subscribed: set = set()
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.ws_connect(self.ws_url, heartbeat=20) as ws:
+                        logging.info("Price stream connected")
+                        backoff = 1.0
+                        while True:
+                            # Subscribe incrementally as trades are opened; if a worker
+                            # holds the trade lock, retry next pass rather than block the loop
+                            new_symbols = None
+                            if self._trade_lock.acquire(blocking=False):
+                                try:
+                                    new_symbols = set(self.active_trades) - subscribed
+                                finally:
+                                    self._trade_lock.release()
+                            if new_symbols:
+                                await ws.send_json({'op': 'subscribe', 'channels': ['ticker'], 'symbols': sorted(new_symbols)})
+                                subscribed |= new_symbols
+                            try:
+                                msg = await ws.receive(timeout=1.0)
+                            except asyncio.TimeoutError:
+                                continue
+                            if msg.type != aiohttp.WSMsgType.TEXT:
+                                break
+                            data = _json_loads(msg.data)
+                            if 'symbol' in data and 'price' in data:
+                                self.last_price[data['symbol']] = (time.monotonic(), float(data['price']))
+                                if self._price_event is not None:
+                                    self._price_event.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning("Price stream error: %s", e)
+            # Never evaluate SL/TP against prices from a dead connection
+            self.last_price.clear()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60.0)
+
+    async def monitor_positions(self, interval: float = 60.0):
+        """Check positions every `interval` seconds without blocking the event loop.
+        With LIGHTER_WS_URL set, checks also run as soon as streamed prices arrive.
+        """
+        loop = asyncio.get_running_loop()
+        stream = None
+        if self.ws_url and aiohttp is not None:
+            self._price_event = asyncio.Event()
+            stream = asyncio.create_task(self.stream_prices())
+        # Polls run on a fixed monotonic cadence, so time spent checking doesn't add drift
+        next_check = time.monotonic() + interval
+        try:
+            while True:
+                try:
+                    prices = None
+                    if stream is not None:
+                        fresh_after = time.monotonic() - self._price_max_age
+                        prices = {symbol: price for symbol, (received_at, price) in self.last_price.items()
+                                  if received_at >= fresh_after}
+                    # check_positions does blocking HTTP/SDK calls, so run it in a worker thread
+                    await loop.run_in_executor(None, self.check_positions, prices)
+                except Exception as e:
+                    logging.error("Error monitoring positions: %s", e)
+                delay = max(0.0, next_check - time.monotonic())
+                if stream is None:
+                    await asyncio.sleep(delay)
+                else:
+                    try:
+                        await asyncio.wait_for(self._price_event.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    self._price_event.clear()
+                # Skip any ticks missed while a slow check overran
+                now = time.monotonic()
+                while next_check <= now:
+                    next_check += interval
+        finally:
+            if stream is not None:
+                stream.cancel()
 
 def main():
     # Initialize trader
@@ -586,10 +935,13 @@ def main():
     # Process the signal
     trader.receive_trade_signal(sample_signal)
     
-    # Start monitoring positions
-    while True:
-        trader.check_positions()
-        time.sleep(60)  # Check every minute
+    # Start monitoring positions (checks every minute)
+    try:
+        asyncio.run(trader.monitor_positions(60))
+    except KeyboardInterrupt:
+        logging.info("Copy trader stopped")
+    finally:
+        trader.close()
 
 if __name__ == "__main__":
     main()
@@ -116,7 +116,7 @@ def show_debugging_tips():
     """Show debugging tips"""
     print("\n🔧 Debugging Tips")
     print("=" * 20)
-    print("1. Check the logs in 'discord_trader.log'")
+    print("1. Check the logs in 'copy_trader.log'")
     print("2. Enable debug logging by setting log level to DEBUG")
     print("3. Test with !status command in Discord")
     print("4. Make sure bot has 'Read Message History' permission")
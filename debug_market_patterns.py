@@ -4,6 +4,58 @@ Debug script to test market order regex patterns
 """
 import re
 
+# The patterns from discord_trader_bot.py
+_PATTERNS = (
+    # Pattern 1: "Buy Now ETH" or "Buy Now BTC 30X" (NEW - MOST SPECIFIC)
+    r'BUY\s+NOW\s+(\w+)(?:\s+(\d+)X)?',
+    
+    # Pattern 2: "Market LONG" or "Market SHORT" (NEW)
+    r'MARKET\s+(LONG|SHORT)',
+    
+    # Pattern 3: "Market Buy BTC 50000", "🚀 Market Long BTC $50000" or
+    # "📈 Limit Short ETH 3000" (the emoji prefix is optional, so one pattern
+    # covers both forms)
+    r'(?:🚀|📈|📊)?\s*(MARKET|LIMIT)\s+(LONG|SHORT|BUY|SELL)\s+(\w+)\s+\$?(\d+(?:\.\d+)?)',
+    
+    # Pattern 4: "SIGNAL: BUY BTC $50000"
+    r'SIGNAL:?\s+(BUY|SELL|LONG|SHORT)\s+(\w+)\s*\$?(\d+(?:\.\d+)?)',
+    
+    # Pattern 5: "Position: LONG BTC ENTRY $50000"
+    r'POSITION:?\s+(LONG|SHORT)\s+(\w+)\s+(?:ENTRY:?)?\s*\$?(\d+(?:\.\d+)?)',
+    
+    # Pattern 6: "BUY BTC AT 50000" or "SELL ETH @ 3000"
+    r'(BUY|SELL|LONG|SHORT)\s+(\w+)\s+(?:AT|@)\s*\$?(\d+(?:\.\d+)?)',
+    
+    # Pattern 7: "BTC BUY 50000" or "ETH LONG $3000"  
+    r'(\w+)\s+(BUY|SELL|LONG|SHORT)\s+\$?(\d+(?:\.\d+)?)',
+    
+    # Pattern 8: "🚀 BTC LONG ENTRY: $50000"
+    r'(?:🚀|📈|📊)?\s*(\w+)\s+(LONG|SHORT|BUY|SELL)\s+(?:ENTRY:?)?\s*\$?(\d+(?:\.\d+)?)',
+    
+    # Pattern 9: "SHORT SOL 150" or "LONG BTC 50000"
+    r'(LONG|SHORT)\s+(\w+)\s+(\d+(?:\.\d+)?)',
+    
+    # Pattern 10: "SELL ETHEREUM 3000"
+    r'(BUY|SELL)\s+(\w+)\s+(\d+(?:\.\d+)?)',
+    
+    # Pattern 11: Handle "50k", "3k" etc. (LEAST SPECIFIC)
+    r'(BUY|SELL|LONG|SHORT)\s+(\w+)\s+(?:AT|@)?\s*\$?(\d+(?:\.\d+)?)[KkMm]?',
+)
+
+# Compiled once at import so the test loop does not go through re's cache
+_COMPILED = tuple(re.compile(p) for p in _PATTERNS)
+
+# Every pattern needs one of these words, so a substring check rejects
+# chatter before any regex runs
+_KEYWORDS = ('BUY', 'SELL', 'LONG', 'SHORT')
+
+# All patterns as one alternation with named branches (p1, p2, ...). One search
+# tells us whether anything matches at all and, via lastgroup, which pattern
+# wins at the leftmost position. Patterns listed before it may still match
+# further right and keep their priority, so only those need re-checking.
+_COMBINED = re.compile('|'.join(f'(?P<p{i}>{p})' for i, p in enumerate(_PATTERNS, 1)))
+
+
 def test_patterns():
     """Test the regex patterns for market orders"""
     print("🔍 Debugging Market Order Patterns")
@@ -19,51 +71,17 @@ def test_patterns():
         "MARKET LONG",
     ]
     
-    # The patterns from discord_trader_bot.py
-    patterns = [
-        # Pattern 1: "Buy Now ETH" or "Buy Now BTC 30X" (NEW - MOST SPECIFIC)
-        r'BUY\s+NOW\s+(\w+)(?:\s+(\d+)X)?',
-        
-        # Pattern 2: "Market LONG" or "Market SHORT" (NEW)
-        r'MARKET\s+(LONG|SHORT)',
-        
-        # Pattern 3: "Market Buy BTC 50000" or "Limit Sell ETH 3000"
-        r'(MARKET|LIMIT)\s+(BUY|SELL|LONG|SHORT)\s+(\w+)\s+\$?(\d+(?:\.\d+)?)',
-        
-        # Pattern 4: "🚀 Market Long BTC $50000" or "📈 Limit Short ETH 3000"
-        r'(?:🚀|📈|📊)?\s*(MARKET|LIMIT)\s+(LONG|SHORT|BUY|SELL)\s+(\w+)\s+\$?(\d+(?:\.\d+)?)',
-        
-        # Pattern 5: "SIGNAL: BUY BTC $50000"
-        r'SIGNAL:?\s+(BUY|SELL|LONG|SHORT)\s+(\w+)\s*\$?(\d+(?:\.\d+)?)',
-        
-        # Pattern 6: "Position: LONG BTC ENTRY $50000"
-        r'POSITION:?\s+(LONG|SHORT)\s+(\w+)\s+(?:ENTRY:?)?\s*\$?(\d+(?:\.\d+)?)',
-        
-        # Pattern 7: "BUY BTC AT 50000" or "SELL ETH @ 3000"
-        r'(BUY|SELL|LONG|SHORT)\s+(\w+)\s+(?:AT|@)\s*\$?(\d+(?:\.\d+)?)',
-        
-        # Pattern 8: "BTC BUY 50000" or "ETH LONG $3000"  
-        r'(\w+)\s+(BUY|SELL|LONG|SHORT)\s+\$?(\d+(?:\.\d+)?)',
-        
-        # Pattern 9: "🚀 BTC LONG ENTRY: $50000"
-        r'(?:🚀|📈|📊)?\s*(\w+)\s+(LONG|SHORT|BUY|SELL)\s+(?:ENTRY:?)?\s*\$?(\d+(?:\.\d+)?)',
-        
-        # Pattern 10: "SHORT SOL 150" or "LONG BTC 50000"
-        r'(LONG|SHORT)\s+(\w+)\s+(\d+(?:\.\d+)?)',
-        
-        # Pattern 11: "SELL ETHEREUM 3000"
-        r'(BUY|SELL)\s+(\w+)\s+(\d+(?:\.\d+)?)',
-        
-        # Pattern 12: Handle "50k", "3k" etc. (LEAST SPECIFIC)
-        r'(BUY|SELL|LONG|SHORT)\s+(\w+)\s+(?:AT|@)?\s*\$?(\d+(?:\.\d+)?)[KkMm]?',
-    ]
-    
     for command in test_commands:
         print(f"\n📝 Testing: '{command}'")
         message = command.upper()
         
-        for i, pattern in enumerate(patterns, 1):
-            match = re.search(pattern, message)
+        combined = None
+        if any(word in message for word in _KEYWORDS):
+            combined = _COMBINED.search(message)
+        candidates = _COMPILED[:int(combined.lastgroup[1:])] if combined else ()
+        
+        for i, cpat in enumerate(candidates, 1):
+            match = cpat.search(message)
             if match:
                 groups = match.groups()
                 print(f"   ✅ Pattern {i} matched: {groups}")
@@ -3,23 +3,106 @@ from discord.ext import commands
 import asyncio
 import re
 import os
-from dotenv import load_dotenv
 import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
 from copy_trader import LighterTrader
 
-# Load environment variables
-load_dotenv()
+try:
+    # Optional libuv-based event loop (pip install uvloop; not available on Windows)
+    import uvloop
+except ImportError:
+    uvloop = None
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,  # Changed to DEBUG for troubleshooting
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('discord_trader.log'),
-        logging.StreamHandler()
-    ]
+# Environment variables: .env is loaded once, by the copy_trader import above
+
+# Logging handlers are configured by the copy_trader import above.
+# Root level defaults to INFO; set LOG_LEVEL=DEBUG to log every channel message
+# and parse attempt while troubleshooting
+_log_level = (os.getenv('LOG_LEVEL') or 'INFO').upper()
+if _log_level not in logging.getLevelNamesMapping():
+    logging.warning("Unknown LOG_LEVEL %r; using INFO", _log_level)
+    _log_level = 'INFO'
+logging.getLogger().setLevel(_log_level)
+
+# Common trading signal patterns (ordered from most specific to general),
+# compiled once at import. Order matters: the first pattern that matches wins.
+TRADE_PATTERNS = tuple(re.compile(p) for p in (
+    # Pattern 1: "Buy Now ETH" or "Buy Now BTC 30X" (NEW - MOST SPECIFIC)
+    r'BUY\s+NOW\s+(\w+)(?:\s+(\d+)X)?',
+    
+    # Pattern 2a: "Market LONG BTC" or "Market SHORT ETH" (NEW - WITH SYMBOL)
+    r'MARKET\s+(LONG|SHORT)\s+(\w+)',
+
+    # Pattern 2b: "Market LONG" or "Market SHORT" (NEW - DEFAULTS TO BTC)
+    r'MARKET\s+(LONG|SHORT)',
+    
+    # Pattern 3/4: "Market Buy BTC 50000", "🚀 Market Long BTC $50000" or
+    # "📈 Limit Short ETH 3000" (the emoji prefix is optional, so one pattern
+    # covers both forms)
+    r'(?:🚀|📈|📊)?\s*(MARKET|LIMIT)\s+(LONG|SHORT|BUY|SELL)\s+(\w+)\s+\$?(\d+(?:\.\d+)?)',
+    
+    # Pattern 5: "SIGNAL: BUY BTC $50000"
+    r'SIGNAL:?\s+(BUY|SELL|LONG|SHORT)\s+(\w+)\s*\$?(\d+(?:\.\d+)?)',
+    
+    # Pattern 6: "Position: LONG BTC ENTRY $50000"
+    r'POSITION:?\s+(LONG|SHORT)\s+(\w+)\s+(?:ENTRY:?)?\s*\$?(\d+(?:\.\d+)?)',
+    
+    # Pattern 7: "BUY BTC AT 50000" or "SELL ETH @ 3000"
+    r'(BUY|SELL|LONG|SHORT)\s+(\w+)\s+(?:AT|@)\s*\$?(\d+(?:\.\d+)?)',
+    
+    # Pattern 8: "BTC BUY 50000" or "ETH LONG $3000"  
+    r'(\w+)\s+(BUY|SELL|LONG|SHORT)\s+\$?(\d+(?:\.\d+)?)',
+    
+    # Pattern 9: "🚀 BTC LONG ENTRY: $50000"
+    r'(?:🚀|📈|📊)?\s*(\w+)\s+(LONG|SHORT|BUY|SELL)\s+(?:ENTRY:?)?\s*\$?(\d+(?:\.\d+)?)',
+    
+    # Pattern 10: "SHORT SOL 150" or "LONG BTC 50000"
+    r'(LONG|SHORT)\s+(\w+)\s+(\d+(?:\.\d+)?)',
+    
+    # Pattern 11: "SELL ETHEREUM 3000"
+    r'(BUY|SELL)\s+(\w+)\s+(\d+(?:\.\d+)?)',
+    
+    # Pattern 12: Handle "50k", "3k" etc. (LEAST SPECIFIC)
+    r'(BUY|SELL|LONG|SHORT)\s+(\w+)\s+(?:AT|@)?\s*\$?(\d+(?:\.\d+)?)[KkMm]?',
+))
+
+# Every pattern above needs one of these words; a plain substring check is
+# enough to reject most chatter before any regex runs.
+ACTION_KEYWORDS = ('BUY', 'SELL', 'LONG', 'SHORT')
+
+# The same patterns as one alternation. Pattern priority is list order, not
+# leftmost position, so this only answers "does anything match at all" - one
+# scan that lets non-signal chatter skip the ordered loop entirely.
+TRADE_SIGNAL_PATTERN = re.compile('|'.join(f'(?:{p.pattern})' for p in TRADE_PATTERNS))
+
+# Leverage hint anywhere in a single-line signal, e.g. "10X" or "LEVERAGE: 10"
+LEVERAGE_PATTERN = re.compile(r'(\d+)X|LEVERAGE[:\s]*(\d+)')
+
+# Multi-line signals: "Limit Long BTC: 117320" or "Market Buy ETH: 3200"
+MULTILINE_SIGNAL_PATTERN = re.compile(r'(LIMIT|MARKET)?\s*(LONG|SHORT|BUY|SELL)\s+(\w+)[:,]?\s*([\d\./\s]+)')
+
+# Multi-line alternatives: "BTC LONG: 117320" or "Short SOL: 150"
+MULTILINE_ALT_PATTERNS = (
+    re.compile(r'(\w+)\s+(LONG|SHORT|BUY|SELL)[:,]\s*([\d\./\s]+)'),
+    re.compile(r'(LONG|SHORT|BUY|SELL)\s+(\w+)[:,]\s*([\d\./\s]+)'),
 )
 
+# Any price-like number, and the number on a "Leverage: 5x" line
+PRICE_PATTERN = re.compile(r'(\d+(?:\.\d+)?)')
+LEVERAGE_LINE_PATTERN = re.compile(r'(\d+)X?')
+
+
+@dataclass(slots=True)
+class BotConfig:
+    """Discord settings parsed once from the environment at startup"""
+    discord_token: Optional[str]
+    channel_id: Optional[int]
+    trader_user_id: Optional[int]
+    auto_execute: bool  # toggled at runtime by !toggle_auto
+
+
 class DiscordTraderBot:
     def __init__(self):
         # Initialize the Lighter trader
@@ -31,12 +114,12 @@ class DiscordTraderBot:
         self.bot = commands.Bot(command_prefix='!', intents=intents)
         
         # Configuration
-        self.config = {
-            'discord_token': os.getenv('DISCORD_BOT_TOKEN'),
-            'channel_id': int(os.getenv('TRADING_CHANNEL_ID')) if os.getenv('TRADING_CHANNEL_ID') else None,
-            'trader_user_id': int(os.getenv('TRADER_USER_ID')) if os.getenv('TRADER_USER_ID') else None,
-            'auto_execute': os.getenv('AUTO_EXECUTE', 'false').lower() == 'true'
-        }
+        self.config = BotConfig(
+            discord_token=os.getenv('DISCORD_BOT_TOKEN'),
+            channel_id=int(os.getenv('TRADING_CHANNEL_ID')) if os.getenv('TRADING_CHANNEL_ID') else None,
+            trader_user_id=int(os.getenv('TRADER_USER_ID')) if os.getenv('TRADER_USER_ID') else None,
+            auto_execute=os.getenv('AUTO_EXECUTE', 'false').lower() == 'true'
+        )
         
         # Setup bot events
         self.setup_bot_events()
@@ -54,82 +137,97 @@ class DiscordTraderBot:
                     return
                 
                 # Log all messages for debugging (only in specified channel)
-                if self.config['channel_id'] and message.channel.id == self.config['channel_id']:
-                    logging.debug(f"Channel message from {message.author.display_name}: {message.content}")
+                if self.config.channel_id and message.channel.id == self.config.channel_id:
+                    logging.debug("Channel message from %s: %s", message.author.display_name, message.content)
                 
                 # Check if message is from the specified channel
-                if self.config['channel_id'] and message.channel.id != self.config['channel_id']:
+                if self.config.channel_id and message.channel.id != self.config.channel_id:
                     return
                 
                 # Check if message is from the specified trader
-                if self.config['trader_user_id'] and message.author.id != self.config['trader_user_id']:
-                    logging.debug(f"Ignoring message from {message.author.display_name} (not target trader)")
+                if self.config.trader_user_id and message.author.id != self.config.trader_user_id:
+                    logging.debug("Ignoring message from %s (not target trader)", message.author.display_name)
                     return
                 
-                # Parse the message for trade signals
-                signal = self.parse_trade_message(message.content)
-                
-                # If no signal found, try parsing multi-line format
-                if not signal:
-                    signal = self.parse_multiline_signal(message.content)
-                else:
-                    # If a single-line signal was found but message contains extra lines (SL/TP),
-                    # merge supplemental fields from supplemental parsing.
-                    if '\n' in message.content or any(tag in message.content.upper() for tag in ['SL', 'STOP', 'TP', 'TAKE PROFIT', 'TARGET']):
-                        supplemental = self.parse_signal_supplement(message.content)
-                        if supplemental:
-                            for key in ['stop_loss', 'take_profit', 'take_profits', 'entries', 'leverage']:
-                                if key in supplemental and key not in signal:
-                                    signal[key] = supplemental[key]
+                # Both parsers need an action word, so chatter without one
+                # skips them entirely
+                signal = None
+                content_upper = message.content.upper()
+                if any(word in content_upper for word in ACTION_KEYWORDS):
+                    # Parse the message for trade signals
+                    signal = self.parse_trade_message(message.content)
+
+                    # If no signal found, try parsing multi-line format
+                    if not signal:
+                        signal = self.parse_multiline_signal(message.content)
+                    else:
+                        # If a single-line signal was found but message contains extra lines (SL/TP),
+                        # merge supplemental fields from supplemental parsing.
+                        if '\n' in message.content or any(tag in content_upper for tag in ['SL', 'STOP', 'TP', 'TAKE PROFIT', 'TARGET']):
+                            supplemental = self.parse_signal_supplement(message.content)
+                            if supplemental:
+                                for key in ['stop_loss', 'take_profit', 'take_profits', 'entries', 'leverage']:
+                                    if key in supplemental and key not in signal:
+                                        signal[key] = supplemental[key]
                 
                 if signal:
-                    logging.info(f"✅ Trade signal detected from {message.author.display_name}: {signal}")
+                    logging.info("✅ Trade signal detected from %s: %s", message.author.display_name, signal)
                     
-                    if self.config['auto_execute']:
+                    if self.config.auto_execute:
                         # Auto-execute the trade
                         try:
-                            success = self.trader.receive_trade_signal(signal)
+                            success = await self.execute_signal(signal)
+                            # Reaction and reply are independent REST calls; send them together
                             if success:
-                                await message.add_reaction('✅')
-                                await message.reply(f"✅ Trade executed: {signal['action']} {signal['symbol']}")
+                                await asyncio.gather(
+                                    message.add_reaction('✅'),
+                                    message.reply(f"✅ Trade executed: {signal['action']} {signal['symbol']}")
+                                )
                             else:
-                                await message.add_reaction('❌')
-                                await message.reply("❌ Failed to execute trade")
+                                await asyncio.gather(
+                                    message.add_reaction('❌'),
+                                    message.reply("❌ Failed to execute trade")
+                                )
                         except Exception as e:
                             logging.error(f"Error executing trade: {str(e)}")
-                            await message.add_reaction('❌')
-                            await message.reply(f"❌ Error: {str(e)}")
+                            await asyncio.gather(
+                                message.add_reaction('❌'),
+                                message.reply(f"❌ Error: {str(e)}")
+                            )
                     else:
-                        # Ask for confirmation
-                        await message.add_reaction('🤔')
-                        # Build pricing/TP details
-                        entries_line = None
+                        # Ask for confirmation; the text is built as a list of lines
+                        lines = [
+                            "📊 **Trade Signal Detected**",
+                            f"Order Type: {signal.get('order_type', 'LIMIT')}",
+                            f"Action: {signal['action']}",
+                            f"Symbol: {signal['symbol']}",
+                        ]
+                        # Pricing/TP details
                         if 'entries' in signal:
-                            entries_fmt = ' / '.join([f"${p}" for p in signal['entries']])
-                            entries_line = f"Entries: {entries_fmt}\n"
-                        price_line = f"Price: ${signal['price']}\n" if 'price' in signal else ''
-                        tps_line = None
+                            lines.append("Entries: " + ' / '.join([f"${p}" for p in signal['entries']]))
+                        elif 'price' in signal:
+                            lines.append(f"Price: ${signal['price']}")
                         if 'take_profits' in signal:
-                            tps_fmt = ' / '.join([f"${p}" for p in signal['take_profits']])
-                            tps_line = f"TPs: {tps_fmt}\n"
-                        tp_single_line = f"TP: ${signal.get('take_profit')}\n" if 'take_profit' in signal and 'take_profits' not in signal else ''
-                        sl_line = f"Stop Loss: ${signal.get('stop_loss')}\n" if 'stop_loss' in signal else ''
-                        details = (entries_line or price_line) + (tps_line or tp_single_line) + sl_line
-                        confirmation_msg = await message.reply(
-                            f"📊 **Trade Signal Detected**\n"
-                            f"Order Type: {signal.get('order_type', 'LIMIT')}\n"
-                            f"Action: {signal['action']}\n"
-                            f"Symbol: {signal['symbol']}\n"
-                            f"{details}"
-                            f"Leverage: {signal.get('leverage', 'default')}\n\n"
-                            f"React with ✅ to execute or ❌ to ignore"
+                            lines.append("TPs: " + ' / '.join([f"${p}" for p in signal['take_profits']]))
+                        elif 'take_profit' in signal:
+                            lines.append(f"TP: ${signal['take_profit']}")
+                        if 'stop_loss' in signal:
+                            lines.append(f"Stop Loss: ${signal['stop_loss']}")
+                        lines.append(f"Leverage: {signal.get('leverage', 'default')}")
+                        lines.append("")
+                        lines.append("React with ✅ to execute or ❌ to ignore")
+                        # The 🤔 reaction goes out alongside the reply instead of before it
+                        _, confirmation_msg = await asyncio.gather(
+                            message.add_reaction('🤔'),
+                            message.reply('\n'.join(lines))
                         )
+                        # Added in order so ✅ shows first on the confirmation
                         await confirmation_msg.add_reaction('✅')
                         await confirmation_msg.add_reaction('❌')
                 else:
                     # Log messages that weren't recognized as signals
                     if len(message.content) > 10:  # Only log substantial messages
-                        logging.debug(f"❌ No signal detected in: '{message.content}'")
+                        logging.debug("❌ No signal detected in: '%s'", message.content)
                 
                 # Process commands
                 await self.bot.process_commands(message)
@@ -152,7 +250,7 @@ class DiscordTraderBot:
                 # Extract signal from the message
                 signal = self.extract_signal_from_confirmation(reaction.message.content)
                 if signal:
-                    success = self.trader.receive_trade_signal(signal)
+                    success = await self.execute_signal(signal)
                     if success:
                         await reaction.message.edit(content=reaction.message.content + "\n\n✅ **EXECUTED**")
                     else:
@@ -165,7 +263,9 @@ class DiscordTraderBot:
         @self.bot.command(name='status')
         async def status_command(ctx):
             """Check bot and trader status"""
-            active_trades = len(self.trader.active_trades)
+            # Copy the trades off the event loop; a worker may hold the trade lock
+            loop = asyncio.get_running_loop()
+            trades = await loop.run_in_executor(None, self.trader.snapshot_trades)
             trading_enabled = not self.trader.simulation_mode
             
             embed = discord.Embed(
@@ -173,8 +273,8 @@ class DiscordTraderBot:
                 color=0x00ff00 if trading_enabled else 0xff9900
             )
             embed.add_field(name="Trading Mode", value="🟢 Live Trading" if trading_enabled else "🟡 Testing Mode", inline=True)
-            embed.add_field(name="Active Trades", value=str(active_trades), inline=True)
-            embed.add_field(name="Auto Execute", value="✅" if self.config['auto_execute'] else "❌", inline=True)
+            embed.add_field(name="Active Trades", value=str(len(trades)), inline=True)
+            embed.add_field(name="Auto Execute", value="✅" if self.config.auto_execute else "❌", inline=True)
             
             if not trading_enabled:
                 embed.add_field(
@@ -183,14 +283,14 @@ class DiscordTraderBot:
                     inline=False
                 )
             
-            if self.trader.active_trades:
+            if trades:
                 trades_info = ""
-                for symbol, trade in self.trader.active_trades.items():
-                    if trade.get('entries'):
-                        entries_fmt = ' / '.join([str(p) for p in trade['entries']])
-                        trades_info += f"{symbol}: entries {entries_fmt} (avg ${trade['entry_price']:.2f})\n"
+                for symbol, trade in trades:
+                    if trade.entries:
+                        entries_fmt = ' / '.join([str(p) for p in trade.entries])
+                        trades_info += f"{symbol}: entries {entries_fmt} (avg ${trade.entry_price:.2f})\n"
                     else:
-                        trades_info += f"{symbol}: ${trade['entry_price']}\n"
+                        trades_info += f"{symbol}: ${trade.entry_price}\n"
                 embed.add_field(name="Positions", value=trades_info, inline=False)
             
             await ctx.send(embed=embed)
@@ -198,8 +298,8 @@ class DiscordTraderBot:
         @self.bot.command(name='toggle_auto')
         async def toggle_auto_execute(ctx):
             """Toggle auto-execution of trades"""
-            self.config['auto_execute'] = not self.config['auto_execute']
-            status = "enabled" if self.config['auto_execute'] else "disabled"
+            self.config.auto_execute = not self.config.auto_execute
+            status = "enabled" if self.config.auto_execute else "disabled"
             await ctx.send(f"🔄 Auto-execution {status}")
         
         @self.bot.command(name='close')
@@ -222,7 +322,7 @@ class DiscordTraderBot:
                         'price': str(price),
                         'order_type': 'LIMIT'
                     }
-                success = self.trader.receive_trade_signal(signal)
+                success = await self.execute_signal(signal)
                 if success:
                     if price is None:
                         await ctx.send(f"✅ Closed {symbol} at market")
@@ -235,52 +335,24 @@ class DiscordTraderBot:
     
     def parse_trade_message(self, message_content: str) -> dict:
         """Parse Discord message to extract trade signals"""
+        # Echoed and re-posted signals repeat the exact text, so parses are
+        # memoized; callers get their own copy since on_message adds keys to it
+        signal = self._parse_trade_message(message_content)
+        return dict(signal) if signal else None
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _parse_trade_message(message_content: str) -> Optional[dict]:
+        """Memoized single-line parse; the returned dict is shared, don't mutate it"""
         message = message_content.upper()
         
-        # Common trading signal patterns (ordered from most specific to general)
-        patterns = [
-            # Pattern 1: "Buy Now ETH" or "Buy Now BTC 30X" (NEW - MOST SPECIFIC)
-            r'BUY\s+NOW\s+(\w+)(?:\s+(\d+)X)?',
-            
-            # Pattern 2a: "Market LONG BTC" or "Market SHORT ETH" (NEW - WITH SYMBOL)
-            r'MARKET\s+(LONG|SHORT)\s+(\w+)',
-
-            # Pattern 2b: "Market LONG" or "Market SHORT" (NEW - DEFAULTS TO BTC)
-            r'MARKET\s+(LONG|SHORT)',
-            
-            # Pattern 3: "Market Buy BTC 50000" or "Limit Sell ETH 3000"
-            r'(MARKET|LIMIT)\s+(BUY|SELL|LONG|SHORT)\s+(\w+)\s+\$?(\d+(?:\.\d+)?)',
-            
-            # Pattern 4: "🚀 Market Long BTC $50000" or "📈 Limit Short ETH 3000"
-            r'(?:🚀|📈|📊)?\s*(MARKET|LIMIT)\s+(LONG|SHORT|BUY|SELL)\s+(\w+)\s+\$?(\d+(?:\.\d+)?)',
-            
-            # Pattern 5: "SIGNAL: BUY BTC $50000"
-            r'SIGNAL:?\s+(BUY|SELL|LONG|SHORT)\s+(\w+)\s*\$?(\d+(?:\.\d+)?)',
-            
-            # Pattern 6: "Position: LONG BTC ENTRY $50000"
-            r'POSITION:?\s+(LONG|SHORT)\s+(\w+)\s+(?:ENTRY:?)?\s*\$?(\d+(?:\.\d+)?)',
-            
-            # Pattern 7: "BUY BTC AT 50000" or "SELL ETH @ 3000"
-            r'(BUY|SELL|LONG|SHORT)\s+(\w+)\s+(?:AT|@)\s*\$?(\d+(?:\.\d+)?)',
-            
-            # Pattern 8: "BTC BUY 50000" or "ETH LONG $3000"  
-            r'(\w+)\s+(BUY|SELL|LONG|SHORT)\s+\$?(\d+(?:\.\d+)?)',
-            
-            # Pattern 9: "🚀 BTC LONG ENTRY: $50000"
-            r'(?:🚀|📈|📊)?\s*(\w+)\s+(LONG|SHORT|BUY|SELL)\s+(?:ENTRY:?)?\s*\$?(\d+(?:\.\d+)?)',
-            
-            # Pattern 10: "SHORT SOL 150" or "LONG BTC 50000"
-            r'(LONG|SHORT)\s+(\w+)\s+(\d+(?:\.\d+)?)',
-            
-            # Pattern 11: "SELL ETHEREUM 3000"
-            r'(BUY|SELL)\s+(\w+)\s+(\d+(?:\.\d+)?)',
-            
-            # Pattern 12: Handle "50k", "3k" etc. (LEAST SPECIFIC)
-            r'(BUY|SELL|LONG|SHORT)\s+(\w+)\s+(?:AT|@)?\s*\$?(\d+(?:\.\d+)?)[KkMm]?',
-        ]
+        if not any(word in message for word in ACTION_KEYWORDS):
+            return None
+        if not TRADE_SIGNAL_PATTERN.search(message):
+            return None
         
-        for pattern in patterns:
-            match = re.search(pattern, message)
+        for pattern in TRADE_PATTERNS:
+            match = pattern.search(message)
             if match:
                 groups = match.groups()
                 
@@ -325,7 +397,7 @@ class DiscordTraderBot:
                     else:
                         symbol, action, price = groups
                 elif len(groups) == 4:
-                    # Pattern 3: "Market Buy BTC 50000" or Pattern 4: "🚀 Market Long BTC $50000"
+                    # Pattern 3/4: "Market Buy BTC 50000" or "🚀 Market Long BTC $50000"
                     if groups[0] in ['MARKET', 'LIMIT']:
                         order_type, action, symbol, price = groups
                     else:
@@ -345,7 +417,7 @@ class DiscordTraderBot:
                     order_type = 'LIMIT'  # Default for single-line signals
                 
                 # Debug logging
-                logging.debug(f"Pattern matched: {groups}, Order type: {order_type}")
+                logging.debug("Pattern matched: %s, Order type: %s", groups, order_type)
                 
                 # Normalize action
                 if action in ['LONG', 'BUY']:
@@ -353,15 +425,18 @@ class DiscordTraderBot:
                 elif action in ['SHORT', 'SELL']:
                     action = 'SELL'
                 
-                # Handle price multipliers (K, M)
-                price_str = price
-                if message.find(price + 'K') != -1:
-                    price = str(float(price) * 1000)
-                elif message.find(price + 'M') != -1:
-                    price = str(float(price) * 1000000)
+                # Handle price multipliers (K, M) written right after the matched price;
+                # market patterns have no price group and nothing to scale
+                if len(groups) >= 3:
+                    price_end = match.end(len(groups))
+                    multiplier = message[price_end:price_end + 1]
+                    if multiplier == 'K':
+                        price = str(float(price) * 1000)
+                    elif multiplier == 'M':
+                        price = str(float(price) * 1000000)
                 
                 # Extract leverage if mentioned
-                leverage_match = re.search(r'(\d+)X|LEVERAGE[:\s]*(\d+)', message)
+                leverage_match = LEVERAGE_PATTERN.search(message)
                 leverage = '2.0'  # default
                 if leverage_match:
                     leverage = leverage_match.group(1) or leverage_match.group(2)
@@ -388,7 +463,10 @@ class DiscordTraderBot:
         Stop Loss: 116690
         TP: 118900
         """
-        lines = message_content.strip().split('\n')
+        # Single-line messages (most traffic) return before any upper-casing
+        if '\n' not in message_content:
+            return None
+        lines = message_content.strip().upper().split('\n')
         if len(lines) < 2:
             return None
         
@@ -396,12 +474,12 @@ class DiscordTraderBot:
         
         # Parse each line
         for line in lines:
-            line = line.strip().upper()
+            line = line.strip()
             
             # Main signal line patterns
             if any(word in line for word in ['LIMIT', 'MARKET']) and any(word in line for word in ['LONG', 'SHORT', 'BUY', 'SELL']):
                 # "Limit Long BTC: 117320" or "Market Buy ETH: 3200"
-                match = re.search(r'(LIMIT|MARKET)?\s*(LONG|SHORT|BUY|SELL)\s+(\w+)[:,]?\s*([\d\./\s]+)', line)
+                match = MULTILINE_SIGNAL_PATTERN.search(line)
                 if match:
                     order_type, action, symbol, price_part = match.groups()
                     
@@ -419,7 +497,7 @@ class DiscordTraderBot:
                     
                     signal['symbol'] = symbol
                     # Extract one or multiple prices
-                    prices_found = re.findall(r'(\d+(?:\.\d+)?)', price_part)
+                    prices_found = PRICE_PATTERN.findall(price_part)
                     if len(prices_found) > 1:
                         signal['entries'] = prices_found
                         signal['price'] = prices_found[0]
@@ -429,13 +507,8 @@ class DiscordTraderBot:
             # Alternative main signal patterns
             elif ':' in line and any(word in line for word in ['LONG', 'SHORT', 'BUY', 'SELL']):
                 # "BTC LONG: 117320" or "ETH BUY: 3200" or "Short SOL: 150"
-                patterns = [
-                    r'(\w+)\s+(LONG|SHORT|BUY|SELL)[:,]\s*([\d\./\s]+)',
-                    r'(LONG|SHORT|BUY|SELL)\s+(\w+)[:,]\s*([\d\./\s]+)'
-                ]
-                
-                for pattern in patterns:
-                    match = re.search(pattern, line)
+                for pattern in MULTILINE_ALT_PATTERNS:
+                    match = pattern.search(line)
                     if match:
                         groups = match.groups()
                         if len(groups) == 3:
@@ -451,7 +524,7 @@ class DiscordTraderBot:
                                 signal['action'] = 'SELL'
                             
                             signal['symbol'] = symbol
-                            prices_found = re.findall(r'(\d+(?:\.\d+)?)', price_part)
+                            prices_found = PRICE_PATTERN.findall(price_part)
                             if len(prices_found) > 1:
                                 signal['entries'] = prices_found
                                 signal['price'] = prices_found[0]
@@ -461,7 +534,7 @@ class DiscordTraderBot:
             
             # Explicit entries line
             elif any(word in line for word in ['ENTRY', 'ENTRIES']):
-                prices_found = re.findall(r'(\d+(?:\.\d+)?)', line)
+                prices_found = PRICE_PATTERN.findall(line)
                 if prices_found:
                     if len(prices_found) > 1:
                         signal['entries'] = prices_found
@@ -471,13 +544,13 @@ class DiscordTraderBot:
             
             # Stop loss line - multiple patterns
             elif any(phrase in line for phrase in ['STOP LOSS', 'STOP:', 'SL:']):
-                match = re.search(r'(\d+(?:\.\d+)?)', line)
+                match = PRICE_PATTERN.search(line)
                 if match:
                     signal['stop_loss'] = match.group(1)
             
             # Take profit line - multiple patterns  
             elif any(word in line for word in ['TP:', 'TAKE PROFIT', 'TARGET:', 'PROFIT:']):
-                prices_found = re.findall(r'(\d+(?:\.\d+)?)', line)
+                prices_found = PRICE_PATTERN.findall(line)
                 if prices_found:
                     if len(prices_found) > 1:
                         signal['take_profits'] = prices_found
@@ -487,7 +560,7 @@ class DiscordTraderBot:
             
             # Leverage line
             elif any(word in line for word in ['LEVERAGE', 'LEV']):
-                match = re.search(r'(\d+)X?', line)
+                match = LEVERAGE_LINE_PATTERN.search(line)
                 if match:
                     signal['leverage'] = match.group(1)
         
@@ -507,21 +580,21 @@ class DiscordTraderBot:
         Does not require action/symbol/price and can be safely merged into a
         pre-parsed single-line signal.
         """
-        lines = message_content.strip().split('\n')
+        lines = message_content.strip().upper().split('\n')
         supplement = {}
         for raw_line in lines:
-            line = raw_line.strip().upper()
+            line = raw_line.strip()
             if not line:
                 continue
             # Stop loss
             if any(phrase in line for phrase in ['STOP LOSS', 'STOP:', 'SL:']):
-                m = re.search(r'(\d+(?:\.\d+)?)', line)
+                m = PRICE_PATTERN.search(line)
                 if m:
                     supplement['stop_loss'] = m.group(1)
                 continue
             # Take profit(s)
             if any(word in line for word in ['TP:', 'TAKE PROFIT', 'TARGET:', 'PROFIT:']):
-                prices_found = re.findall(r'(\d+(?:\.\d+)?)', line)
+                prices_found = PRICE_PATTERN.findall(line)
                 if prices_found:
                     if len(prices_found) > 1:
                         supplement['take_profits'] = prices_found
@@ -531,7 +604,7 @@ class DiscordTraderBot:
                 continue
             # Entries
             if any(word in line for word in ['ENTRY', 'ENTRIES']):
-                prices_found = re.findall(r'(\d+(?:\.\d+)?)', line)
+                prices_found = PRICE_PATTERN.findall(line)
                 if prices_found:
                     if len(prices_found) > 1:
                         supplement['entries'] = prices_found
@@ -539,7 +612,7 @@ class DiscordTraderBot:
                 continue
             # Leverage
             if any(word in line for word in ['LEVERAGE', 'LEV']):
-                m = re.search(r'(\d+)X?', line)
+                m = LEVERAGE_LINE_PATTERN.search(line)
                 if m:
                     supplement['leverage'] = m.group(1)
                 continue
@@ -556,12 +629,12 @@ class DiscordTraderBot:
             elif line.startswith('Symbol:'):
                 signal['symbol'] = line.split(':')[1].strip()
             elif line.startswith('Entries:'):
-                prices_found = re.findall(r'(\d+(?:\.\d+)?)', line)
+                prices_found = PRICE_PATTERN.findall(line)
                 if prices_found:
                     signal['entries'] = prices_found
                     signal['price'] = prices_found[0]
             elif line.startswith('TPs:'):
-                prices_found = re.findall(r'(\d+(?:\.\d+)?)', line)
+                prices_found = PRICE_PATTERN.findall(line)
                 if prices_found:
                     signal['take_profits'] = prices_found
                     signal['take_profit'] = prices_found[0]
@@ -576,33 +649,47 @@ class DiscordTraderBot:
         return signal if len(signal) >= 3 else None
     
     
+    async def execute_signal(self, signal: dict) -> bool:
+        """Hand a signal to the trader without blocking the event loop.
+        Order placement waits on the Lighter API, so it runs in a worker
+        thread while Discord events keep being served.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.trader.receive_trade_signal, signal)
+    
+    async def _run_async(self):
+        """Run the Discord client and position monitoring on one event loop"""
+        # Check positions every minute alongside Discord event handling
+        monitor = asyncio.create_task(self.trader.monitor_positions(60))
+        try:
+            async with self.bot:
+                await self.bot.start(self.config.discord_token)
+        finally:
+            monitor.cancel()
+            try:
+                await monitor
+            except asyncio.CancelledError:
+                pass
+            # close() waits on the trade lock for a check still running in a worker thread
+            await asyncio.get_running_loop().run_in_executor(None, self.trader.close)
+    
     def run(self):
         """Start the Discord bot"""
-        if not self.config['discord_token']:
+        if not self.config.discord_token:
             logging.error("Discord bot token not found in environment variables")
             return
         
         logging.info("Starting Discord trader bot...")
-        self.bot.run(self.config['discord_token'])
+        if uvloop is not None:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        try:
+            asyncio.run(self._run_async())
+        except KeyboardInterrupt:
+            logging.info("Discord trader bot stopped")
 
 def main():
-    # Start the Discord bot
+    # Start the Discord bot; position monitoring runs alongside it
     discord_bot = DiscordTraderBot()
-    
-    # Start position monitoring in background
-    async def monitor_positions():
-        while True:
-            discord_bot.trader.check_positions()
-            await asyncio.sleep(60)  # Check every minute
-    
-    # Run both the Discord bot and position monitoring
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
-    # Start position monitoring task
-    loop.create_task(monitor_positions())
-    
-    # Start Discord bot
     discord_bot.run()
 
 if __name__ == "__main__":
@@ -19,6 +19,9 @@ intents = discord.Intents.default()
 intents.message_content = True
 bot = commands.Bot(command_prefix='!', intents=intents)
 
+# Same action-word gate the trader bot runs before parsing
+SIGNAL_KEYWORDS = ('BUY', 'SELL', 'LONG', 'SHORT')
+
 @bot.event
 async def on_ready():
     print(f'✅ {bot.user} has connected to Discord!')
@@ -34,8 +37,9 @@ async def on_message(message):
     
     print(f"📨 Message from {message.author.display_name} in #{message.channel.name}: {message.content}")
     
-    # Test simple signal detection
-    if any(word in message.content.upper() for word in ['BUY', 'SELL', 'LONG', 'SHORT']):
+    # Test simple signal detection (upper-case once, not once per keyword)
+    content_upper = message.content.upper()
+    if any(word in content_upper for word in SIGNAL_KEYWORDS):
         print(f"🎯 Potential signal detected!")
         await message.add_reaction('👀')
     
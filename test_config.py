@@ -4,9 +4,25 @@ Test script to validate environment configuration before running the bot
 """
 import os
 from dotenv import load_dotenv
-from web3 import Web3
 import requests
 
+# Required variables for Discord functionality
+REQUIRED_VARS = {
+    'DISCORD_BOT_TOKEN': 'Discord bot token',
+}
+
+# Optional variables
+OPTIONAL_VARS = {
+    'TRADING_CHANNEL_ID': 'Discord channel ID',
+    'TRADER_USER_ID': 'Discord user ID to copy',
+    'MAX_POSITION_SIZE': 'Maximum position size (coin units)',
+    'LEVERAGE': 'Trading leverage',
+    'AUTO_EXECUTE': 'Auto-execute trades',
+    'HYPERLIQUID_API_BASE': 'Hyperliquid API base URL',
+    'HL_API_PRIVATE_KEY': 'Hyperliquid API wallet private key',
+    'HL_TESTNET': 'Use Hyperliquid testnet endpoints'
+}
+
 def test_environment():
     """Test environment variables and configuration"""
     print("🔍 Testing Copy Trader Bot Configuration...")
@@ -15,29 +31,15 @@ def test_environment():
     # Load environment variables
     load_dotenv()
     
-    # Required variables for Discord functionality
-    required_vars = {
-        'DISCORD_BOT_TOKEN': 'Discord bot token',
-    }
-    
-    # Optional variables
-    optional_vars = {
-        'TRADING_CHANNEL_ID': 'Discord channel ID',
-        'TRADER_USER_ID': 'Discord user ID to copy',
-        'MAX_POSITION_SIZE': 'Maximum position size (coin units)',
-        'LEVERAGE': 'Trading leverage',
-        'AUTO_EXECUTE': 'Auto-execute trades',
-        'HYPERLIQUID_API_BASE': 'Hyperliquid API base URL',
-        'HL_API_PRIVATE_KEY': 'Hyperliquid API wallet private key',
-        'HL_TESTNET': 'Use Hyperliquid testnet endpoints'
-    }
+    # Read every variable once; later sections reuse these values
+    env = {var: os.getenv(var) for var in (*REQUIRED_VARS, *OPTIONAL_VARS)}
     
     errors = []
     warnings = []
     
     print("📋 REQUIRED CONFIGURATION:")
-    for var, description in required_vars.items():
-        value = os.getenv(var)
+    for var, description in REQUIRED_VARS.items():
+        value = env[var]
         if value:
             if var == 'PRIVATE_KEY':
                 # Validate private key format
@@ -64,8 +66,8 @@ def test_environment():
             errors.append(f"Missing {var}")
     
     print("\n📋 OPTIONAL CONFIGURATION:")
-    for var, description in optional_vars.items():
-        value = os.getenv(var)
+    for var, description in OPTIONAL_VARS.items():
+        value = env[var]
         if value:
             if var in ['TRADING_CHANNEL_ID', 'TRADER_USER_ID']:
                 try:
@@ -82,7 +84,7 @@ def test_environment():
     
     # Test Hyperliquid API connectivity
     print("\n🌐 HYPERLIQUID API:")
-    api_base = os.getenv('HYPERLIQUID_API_BASE', 'https://api.hyperliquid.xyz')
+    api_base = env['HYPERLIQUID_API_BASE'] or 'https://api.hyperliquid.xyz'
     try:
         r = requests.get(f"{api_base}/info", timeout=5)
         if r.status_code == 200:
@@ -96,9 +98,9 @@ def test_environment():
     
     # Test API mode credentials presence
     print("\n🔐 API MODE:")
-    hl_pk = os.getenv('HL_API_PRIVATE_KEY')
+    hl_pk = env['HL_API_PRIVATE_KEY']
     if hl_pk:
-        masked = hl_pk[:6] + "..." + hl_pk[-4:] if len(hl_pk) > 12 else "(hidden)"
+        masked = f"{hl_pk[:6]}...{hl_pk[-4:]}" if len(hl_pk) > 12 else "(hidden)"
         print(f"  ✅ HL_API_PRIVATE_KEY: {masked}")
         print("  ✅ API mode credentials present")
     else:
@@ -4,39 +4,52 @@ Test script to verify signal parsing works correctly
 """
 import re
 
+# Common trading signal patterns, compiled once at import
+_PATTERNS = tuple(re.compile(p) for p in (
+    # Pattern 1: "BUY BTC AT 50000" or "SELL ETH @ 3000"
+    r'(BUY|SELL|LONG|SHORT)\s+(\w+)\s+(?:AT|@)\s*\$?(\d+(?:\.\d+)?)',
+    
+    # Pattern 2: "BTC BUY 50000" or "ETH LONG $3000"
+    r'(\w+)\s+(BUY|SELL|LONG|SHORT)\s*\$?(\d+(?:\.\d+)?)',
+    
+    # Pattern 3: "🚀 BTC LONG ENTRY: $50000"
+    r'(?:🚀|📈|📊)?\s*(\w+)\s+(LONG|SHORT|BUY|SELL)\s+(?:ENTRY:?)?\s*\$?(\d+(?:\.\d+)?)',
+    
+    # Pattern 4: "SIGNAL: BUY BTC $50000"
+    r'SIGNAL:?\s+(BUY|SELL|LONG|SHORT)\s+(\w+)\s*\$?(\d+(?:\.\d+)?)',
+    
+    # Pattern 5: "SHORT SOL 150" or "LONG BTC 50000"
+    r'(LONG|SHORT)\s+(\w+)\s+(\d+(?:\.\d+)?)',
+    
+    # Pattern 6: "SELL ETHEREUM 3000"
+    r'(BUY|SELL)\s+(\w+)\s+(\d+(?:\.\d+)?)',
+    
+    # Pattern 7: Handle "50k", "3k" etc.
+    r'(BUY|SELL|LONG|SHORT)\s+(\w+)\s+(?:AT|@)?\s*\$?(\d+(?:\.\d+)?)[KkMm]?',
+    
+    # Pattern 8: "Position: LONG BTC ENTRY $50000"
+    r'POSITION:?\s+(LONG|SHORT)\s+(\w+)\s+(?:ENTRY:?)?\s*\$?(\d+(?:\.\d+)?)',
+))
+
+# All patterns as one alternation with named branches (p1, p2, ...). One search
+# rejects non-signals and, via lastgroup, names the pattern that wins at the
+# leftmost position. Earlier patterns keep priority even if they match further
+# right, so only the patterns up to that one need to be tried in order.
+_COMBINED = re.compile('|'.join(f'(?P<p{i}>{p.pattern})' for i, p in enumerate(_PATTERNS, 1)))
+
+# Leverage hint anywhere in the message, e.g. "5X" or "LEVERAGE: 5"
+_LEVERAGE_RE = re.compile(r'(\d+)X|LEVERAGE[:\s]*(\d+)')
+
 def parse_trade_message(message_content: str) -> dict:
     """Parse Discord message to extract trade signals - same logic as bot"""
     message = message_content.upper()
     
-    # Common trading signal patterns
-    patterns = [
-        # Pattern 1: "BUY BTC AT 50000" or "SELL ETH @ 3000"
-        r'(BUY|SELL|LONG|SHORT)\s+(\w+)\s+(?:AT|@)\s*\$?(\d+(?:\.\d+)?)',
-        
-        # Pattern 2: "BTC BUY 50000" or "ETH LONG $3000"
-        r'(\w+)\s+(BUY|SELL|LONG|SHORT)\s*\$?(\d+(?:\.\d+)?)',
-        
-        # Pattern 3: "🚀 BTC LONG ENTRY: $50000"
-        r'(?:🚀|📈|📊)?\s*(\w+)\s+(LONG|SHORT|BUY|SELL)\s+(?:ENTRY:?)?\s*\$?(\d+(?:\.\d+)?)',
-        
-        # Pattern 4: "SIGNAL: BUY BTC $50000"
-        r'SIGNAL:?\s+(BUY|SELL|LONG|SHORT)\s+(\w+)\s*\$?(\d+(?:\.\d+)?)',
-        
-        # Pattern 5: "SHORT SOL 150" or "LONG BTC 50000"
-        r'(LONG|SHORT)\s+(\w+)\s+(\d+(?:\.\d+)?)',
-        
-        # Pattern 6: "SELL ETHEREUM 3000"
-        r'(BUY|SELL)\s+(\w+)\s+(\d+(?:\.\d+)?)',
-        
-        # Pattern 7: Handle "50k", "3k" etc.
-        r'(BUY|SELL|LONG|SHORT)\s+(\w+)\s+(?:AT|@)?\s*\$?(\d+(?:\.\d+)?)[KkMm]?',
-        
-        # Pattern 8: "Position: LONG BTC ENTRY $50000"
-        r'POSITION:?\s+(LONG|SHORT)\s+(\w+)\s+(?:ENTRY:?)?\s*\$?(\d+(?:\.\d+)?)',
-    ]
+    combined = _COMBINED.search(message)
+    if not combined:
+        return None
     
-    for pattern in patterns:
-        match = re.search(pattern, message)
+    for pattern in _PATTERNS[:int(combined.lastgroup[1:])]:
+        match = pattern.search(message)
         if match:
             groups = match.groups()
             
@@ -55,14 +68,15 @@ def parse_trade_message(message_content: str) -> dict:
             elif action in ['SHORT', 'SELL']:
                 action = 'SELL'
             
-            # Handle price multipliers (K, M)
-            if message.find(price + 'K') != -1:
+            # Handle price multipliers (K, M) written right after the matched price
+            multiplier = message[match.end(3):match.end(3) + 1]
+            if multiplier == 'K':
                 price = str(float(price) * 1000)
-            elif message.find(price + 'M') != -1:
+            elif multiplier == 'M':
                 price = str(float(price) * 1000000)
             
             # Extract leverage if mentioned
-            leverage_match = re.search(r'(\d+)X|LEVERAGE[:\s]*(\d+)', message)
+            leverage_match = _LEVERAGE_RE.search(message)
             leverage = '2.0'  # default
             if leverage_match:
                 leverage = leverage_match.group(1) or leverage_match.group(2)